@@ -1,69 +1,141 @@
-from utils.data_fetcher import fetch_data
-from utils.google_sheets import connect_to_sheets, log_trade, apply_conditional_formatting
+from utils.data_fetcher import fetch_data, FETCH_PERIOD, FETCH_INTERVAL
+from utils.google_sheets import connect_to_sheets, log_trade, trade_logged, apply_conditional_formatting
 from utils.backtester import backtest
-from utils.ml_model import train_improved_model  # Changed import name
+from utils.ml_model import train_improved_model, MODEL_VERSION  # Changed import name
+from utils.strategy import STRATEGY_VERSION
 from utils.notifier import send_telegram  # Telegram notification active
+from utils.checkpoint import RunJournal, run_fingerprint
+from utils.sharding import parse_shard, shard_tickers, collect_shard_results
 from config import API_STOCKS
 from datetime import datetime
 import schedule
 import time
 import os
 import base64
+import argparse
+import csv
 
 # 🔓 Decode credentials.json if running from an environment variable
 if os.getenv("ENCODED_GOOGLE_CREDS"):
     with open("credentials.json", "wb") as f:
         f.write(base64.b64decode(os.getenv("ENCODED_GOOGLE_CREDS")))
 
-def run_trading_job():
+REPORT_DIR = os.getenv("REPORT_DIR", "reports")
+
+def job_params():
+    return {"period": FETCH_PERIOD, "interval": FETCH_INTERVAL,
+            "strategy": STRATEGY_VERSION, "model": MODEL_VERSION}
+
+def job_fingerprint(shard=None):
+    params = job_params()
+    if shard is not None:
+        params["shard"] = f"{shard[0]}/{shard[1]}"
+    return run_fingerprint(API_STOCKS, **params)
+
+def signal_label(auc_score):
+    if auc_score and auc_score > 0.65:
+        return '🚀 Strong Signal'
+    if auc_score and auc_score < 0.55:
+        return '⚠️ Weak Signal'
+    return '📊 Moderate Signal'
+
+def run_trading_job(shard=None):
     sheet = connect_to_sheets()
+    journal = RunJournal(job_fingerprint(shard))
 
-    for stock in API_STOCKS:
-        print(f"\n📱 Fetching data for {stock}...")
-        df = fetch_data(stock)
+    tickers = API_STOCKS
+    # Sharded workers leave alerts to the merge step's single digest
+    final_stage = "notified"
+    if shard is not None:
+        tickers = shard_tickers(API_STOCKS, *shard)
+        final_stage = "logged"
+        print(f"🧩 Shard {shard[0]}/{shard[1]}: {len(tickers)} of {len(API_STOCKS)} stocks")
 
-        if df is None or df.empty:
-            print(f"❌ Skipping {stock} - no data received.")
+    for stock in tickers:
+        if journal.is_done(stock, final_stage) or journal.is_done(stock, "skipped"):
+            print(f"\n⏭️ Skipping {stock} - already completed in this run.")
             continue
 
-        try:
-            total_return, win_ratio, result_df = backtest(df)
-        except Exception as e:
-            print(f"⚠️ Backtesting failed for {stock}: {e}")
-            continue
+        if journal.is_done(stock, "model"):
+            # Backtest and ML fit already finished before the restart; reuse them
+            print(f"\n♻️ Resuming {stock} from checkpoint...")
+            total_return = journal.get(stock, "backtest")["total_return"]
+            win_ratio = journal.get(stock, "backtest")["win_ratio"]
+            accuracy = journal.get(stock, "model")["accuracy"]
+            auc_score = journal.get(stock, "model")["auc_score"]
+            model_type = journal.get(stock, "model")["model_type"]
+        else:
+            print(f"\n📱 Fetching data for {stock}...")
+            df = fetch_data(stock, period=FETCH_PERIOD, interval=FETCH_INTERVAL)
 
-        if result_df is None or result_df.empty:
-            print(f"⚠️ No trades/backtest results for {stock}. Skipping ML & logging.")
-            continue
+            if df is None or df.empty:
+                # yfinance returns an empty frame on outages and rate limits too, so
+                # this is left unrecorded and retried on restart
+                print(f"❌ Skipping {stock} - no data received.")
+                continue
 
-        try:
-            # Updated function call with improved model
-            model, accuracy, auc_score = train_improved_model(result_df)  # Now returns 3 values
-            model_type = "Enhanced Ensemble"
-        except Exception as e:
-            print(f"⚠️ ML training failed for {stock}: {e}")
-            accuracy = None
-            auc_score = None
-            model_type = "N/A"
+            try:
+                total_return, win_ratio, result_df = backtest(df)
+            except Exception as e:
+                print(f"⚠️ Backtesting failed for {stock}: {e}")
+                journal.mark(stock, "skipped", reason=f"backtest failed: {e}")
+                continue
+
+            if result_df is None or result_df.empty:
+                print(f"⚠️ No trades/backtest results for {stock}. Skipping ML & logging.")
+                journal.mark(stock, "skipped", reason="no backtest results")
+                continue
+
+            journal.mark(stock, "backtest", total_return=float(total_return), win_ratio=float(win_ratio))
+
+            try:
+                # Updated function call with improved model
+                model, accuracy, auc_score = train_improved_model(result_df)  # Now returns 3 values
+                model_type = "Enhanced Ensemble"
+            except Exception as e:
+                print(f"⚠️ ML training failed for {stock}: {e}")
+                model = None
+                accuracy = None
+                auc_score = None
+                model_type = "N/A"
+
+            # A failed fit is not checkpointed, so a restart retries it as long as
+            # the stock has not yet been written to the sinks with N/A metrics
+            if model is not None:
+                journal.mark(stock, "model", accuracy=float(accuracy), auc_score=float(auc_score),
+                             model_type=model_type)
 
         accuracy_str = f"{accuracy:.2%}" if accuracy is not None else "N/A"
         auc_str = f"{auc_score:.3f}" if auc_score is not None else "N/A"
 
-        try:
-            # Enhanced logging with AUC score
-            log_trade(sheet, [
-                stock,
-                f"{total_return:.2%}",
-                f"{win_ratio:.2%}",
-                accuracy_str,
-                auc_str  # Add AUC score to logging
-            ])
-        except Exception as e:
-            print(f"⚠️ Failed to log {stock} to Google Sheets: {e}")
-            continue
+        if not journal.is_done(stock, "logged"):
+            run_key = journal.key(stock)
+            try:
+                # A leftover intent means the last run died around the append; check the sheet first
+                if journal.is_done(stock, "logging") and trade_logged(sheet, run_key):
+                    print(f"♻️ {stock} already in Google Sheets from the interrupted run.")
+                else:
+                    journal.mark(stock, "logging")
+                    # Enhanced logging with AUC score
+                    log_trade(sheet, [
+                        stock,
+                        f"{total_return:.2%}",
+                        f"{win_ratio:.2%}",
+                        accuracy_str,
+                        auc_str  # Add AUC score to logging
+                    ], run_key=run_key)
+            except Exception as e:
+                print(f"⚠️ Failed to log {stock} to Google Sheets: {e}")
+                journal.clear(stock, "logging")
+                continue
+
+            journal.mark(stock, "logged")
+
+            print(f"✅ Logged: {stock} | Return: {total_return:.2%}, Win Ratio: {win_ratio:.2%}, "
+                  f"ML Accuracy: {accuracy_str}, AUC: {auc_str} | Model: {model_type}")
 
-        print(f"✅ Logged: {stock} | Return: {total_return:.2%}, Win Ratio: {win_ratio:.2%}, "
-              f"ML Accuracy: {accuracy_str}, AUC: {auc_str} | Model: {model_type}")
+        if shard is not None:
+            continue
 
         try:
             message = f'''
@@ -77,19 +149,112 @@ def run_trading_job():
 🔹 ML AUC Score: {auc_str}
 🔹 Model Used: {model_type}
 
-{'🚀 Strong Signal' if (auc_score and auc_score > 0.65) else '⚠️ Weak Signal' if (auc_score and auc_score < 0.55) else '📊 Moderate Signal'}
+{signal_label(auc_score)}
 '''
-            send_telegram(message.strip())
+            # Telegram can't be queried for what was sent, so alerts are at-most-once:
+            # an intent left by a run that died mid-send is not retried
+            if journal.is_done(stock, "notifying"):
+                print(f"⚠️ Telegram alert for {stock} may already have been sent. Not resending.")
+                journal.mark(stock, "notified")
+                continue
+            journal.mark(stock, "notifying")
+            if send_telegram(message.strip()):
+                journal.mark(stock, "notified")
+            else:
+                journal.clear(stock, "notifying")
         except Exception as e:
             print(f"⚠️ Telegram message failed: {e}")
+            journal.clear(stock, "notifying")
 
     # try:
     #     apply_conditional_formatting()
     # except Exception as e:
     #     print(f"⚠️ Failed to apply conditional formatting: {e}")
 
-# 🔁 Run job once manually
-run_trading_job()
+DIGEST_TOP_N = 5
+
+def merge_shard_results(shard_count, run_date=None):
+    run_date = run_date or datetime.now().strftime("%Y-%m-%d")
+    journals = [RunJournal(job_fingerprint((i, shard_count)), run_date=run_date)
+                for i in range(shard_count)]
+    done, skipped, missing = collect_shard_results(API_STOCKS, journals)
+
+    os.makedirs(REPORT_DIR, exist_ok=True)
+    report_path = os.path.join(REPORT_DIR, f"{run_date}_shards-{shard_count}.csv")
+    with open(report_path, "w", newline="", encoding="utf-8") as f:
+        writer = csv.DictWriter(f, fieldnames=["stock", "total_return", "win_ratio", "accuracy",
+                                               "auc_score", "model_type", "reason"], restval="")
+        writer.writeheader()
+        writer.writerows(done)
+        writer.writerows(skipped)
+    print(f"📄 Merged {len(done)} done + {len(skipped)} skipped of {len(API_STOCKS)} stocks into {report_path}")
+
+    # Only unfinished workers hold the digest back, so it goes out once, complete
+    if missing:
+        print(f"⚠️ {len(missing)} stocks not finished by any shard yet "
+              f"(e.g. {', '.join(missing[:10])}). Re-run --merge once all shards finish.")
+        return
+
+    digest_journal = RunJournal(run_fingerprint(API_STOCKS, **job_params(), shards=shard_count, digest=True),
+                                run_date=run_date)
+    if digest_journal.is_done("ALL", "notified") or digest_journal.is_done("ALL", "notifying"):
+        print("⏭️ Digest already sent for this run.")
+        return
+
+    # One summary message regardless of universe size; Telegram caps messages at 4096 chars
+    ranked = sorted((row for row in done if row["auc_score"] is not None),
+                    key=lambda row: row["auc_score"], reverse=True)
+    labels = [signal_label(row["auc_score"]) for row in done]
+    lines = [f"📈 Algo-Trading Digest ({datetime.strptime(run_date, '%Y-%m-%d').strftime('%d %B %Y')})", "",
+             "🔸 Strategy: RSI < 40 + 20DMA > 50DMA",
+             f"🔹 Stocks: {len(done)} analysed, {len(skipped)} skipped, {len(API_STOCKS)} total",
+             f"🔹 Signals: {labels.count('🚀 Strong Signal')} strong, "
+             f"{labels.count('📊 Moderate Signal')} moderate, {labels.count('⚠️ Weak Signal')} weak"]
+    for title, rows in (("🚀 Top", ranked[:DIGEST_TOP_N]),
+                        ("⚠️ Bottom", ranked[DIGEST_TOP_N:][::-1][:DIGEST_TOP_N])):
+        if rows:
+            lines += ["", f"{title} {len(rows)} by AUC:"]
+            lines += [f"• {row['stock']}: AUC {row['auc_score']:.3f}, Return {row['total_return']:.2%}, "
+                      f"Win {row['win_ratio']:.2%}" for row in rows]
+    lines += ["", f"📄 Full report: {report_path}"]
+
+    try:
+        digest_journal.mark("ALL", "notifying")
+        if send_telegram("\n".join(lines)):
+            digest_journal.mark("ALL", "notified")
+        else:
+            digest_journal.clear("ALL", "notifying")
+    except Exception as e:
+        print(f"⚠️ Telegram digest failed: {e}")
+        digest_journal.clear("ALL", "notifying")
+
+def parse_run_date(value):
+    try:
+        return datetime.strptime(value, "%Y-%m-%d").strftime("%Y-%m-%d")
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"Invalid date '{value}'. Expected YYYY-MM-DD.")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Run the daily algo-trading job.")
+    mode = parser.add_mutually_exclusive_group()
+    mode.add_argument("--shard", type=parse_shard, metavar="i/N",
+                      help="Only process shard i of N of API_STOCKS (0-based).")
+    mode.add_argument("--merge", type=int, metavar="N",
+                      help="Merge results from N shards into one report and Telegram digest.")
+    parser.add_argument("--date", type=parse_run_date, metavar="YYYY-MM-DD",
+                        help="Run date whose shard results --merge reads (default: today).")
+    args = parser.parse_args()
+
+    if args.merge is not None and args.merge < 1:
+        parser.error("--merge needs N >= 1.")
+    if args.date and args.merge is None:
+        parser.error("--date only applies to --merge.")
+
+    # 🔁 Run job once manually
+    if args.merge is not None:
+        merge_shard_results(args.merge, run_date=args.date)
+    else:
+        run_trading_job(shard=args.shard)
 
 # Optional: Schedule to run daily
 # schedule.every().day.at("09:15").do(run_trading_job)
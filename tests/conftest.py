@@ -0,0 +1,31 @@
+import importlib
+import os
+import sys
+
+import pytest
+
+# utils/ is imported from the repo root, same as main.py does
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import stubs  # noqa: E402
+
+
+@pytest.fixture
+def load_main(tmp_path, monkeypatch):
+    """Import main.py against the stubs, with a fresh working directory.
+
+    Call it after setting STUB_* variables; call it again to simulate a restart.
+    """
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.delenv("ENCODED_GOOGLE_CREDS", raising=False)
+    monkeypatch.delenv("CHECKPOINT_DIR", raising=False)
+    monkeypatch.delenv("REPORT_DIR", raising=False)
+
+    def load():
+        for name, module in stubs.build_modules().items():
+            monkeypatch.setitem(sys.modules, name, module)
+        sys.modules.pop("main", None)
+        return importlib.import_module("main")
+
+    yield load
+    sys.modules.pop("main", None)
@@ -0,0 +1,17 @@
+"""Run main.py as a script with the test stubs in place.
+
+Usage: python tests/run_stubbed_main.py [main.py arguments...]
+"""
+import os
+import runpy
+import sys
+
+TESTS_DIR = os.path.dirname(os.path.abspath(__file__))
+REPO_ROOT = os.path.dirname(TESTS_DIR)
+sys.path[:0] = [REPO_ROOT, TESTS_DIR]
+
+import stubs  # noqa: E402
+
+sys.modules.update(stubs.build_modules())
+sys.argv[0] = os.path.join(REPO_ROOT, "main.py")
+runpy.run_path(sys.argv[0], run_name="__main__")
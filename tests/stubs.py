@@ -0,0 +1,107 @@
+"""Stand-ins for the modules main.py imports that need the network or heavy ML deps.
+
+Behaviour is driven by STUB_* environment variables, read at call time, so the
+same stubs work in-process and in worker processes started through
+run_stubbed_main.py. Every fetch, fit and sink write is appended to a
+JSON-lines file in the working directory for the tests to inspect.
+"""
+import json
+import os
+import types
+
+FETCH_FILE = "fetches.jsonl"
+FIT_FILE = "fits.jsonl"
+SHEET_FILE = "sheet_rows.jsonl"
+TELEGRAM_FILE = "telegram.jsonl"
+
+
+class Crash(BaseException):
+    # Simulates the process dying; main.py only catches Exception
+    pass
+
+
+class Frame:
+    def __init__(self, ticker, empty=False):
+        self.ticker = ticker
+        self.empty = empty
+
+
+def _env_list(name):
+    return [item for item in os.getenv(name, "").split(",") if item]
+
+
+def _append(path, record):
+    with open(path, "a", encoding="utf-8") as f:
+        f.write(json.dumps(record) + "\n")
+
+
+def read_records(path):
+    if not os.path.exists(path):
+        return []
+    with open(path, encoding="utf-8") as f:
+        return [json.loads(line) for line in f]
+
+
+def fetch_data(ticker, period="12mo", interval="1d"):
+    _append(FETCH_FILE, ticker)
+    return Frame(ticker, empty=ticker in _env_list("STUB_EMPTY"))
+
+
+def backtest(df):
+    return 0.05, 0.6, Frame(df.ticker, empty=df.ticker in _env_list("STUB_NO_TRADES"))
+
+
+def train_improved_model(df):
+    _append(FIT_FILE, df.ticker)
+    if df.ticker in _env_list("STUB_FAIL_FIT"):
+        return None, None, None
+    # Spread AUCs out so the digest has distinct top/bottom entries
+    return object(), 0.7, 0.4 + (sum(map(ord, df.ticker)) % 50) / 100
+
+
+def connect_to_sheets():
+    return object()
+
+
+def log_trade(sheet, trade_data, run_key=None):
+    if os.getenv("STUB_SHEET_DOWN"):
+        raise RuntimeError("Sheets API unavailable")
+    _append(SHEET_FILE, {"row": trade_data, "key": run_key})
+    if trade_data[0] in _env_list("STUB_CRASH_AFTER_LOG"):
+        raise Crash(f"died after logging {trade_data[0]}")
+
+
+def trade_logged(sheet, run_key):
+    return any(record["key"] == run_key for record in read_records(SHEET_FILE))
+
+
+def send_telegram(message):
+    if os.getenv("STUB_TELEGRAM_DOWN"):
+        return False
+    _append(TELEGRAM_FILE, message)
+    for ticker in _env_list("STUB_CRASH_AFTER_NOTIFY"):
+        if f"Stock: {ticker}\n" in message:
+            raise Crash(f"died after notifying {ticker}")
+    return True
+
+
+def build_modules():
+    """Module objects to place in sys.modules before importing main."""
+    attrs = {
+        "config": {"API_STOCKS": _env_list("STUB_STOCKS")},
+        "schedule": {},
+        "utils.data_fetcher": {"fetch_data": fetch_data, "FETCH_PERIOD": "12mo", "FETCH_INTERVAL": "1d"},
+        "utils.google_sheets": {"connect_to_sheets": connect_to_sheets, "log_trade": log_trade,
+                                "trade_logged": trade_logged, "apply_conditional_formatting": None},
+        "utils.backtester": {"backtest": backtest},
+        "utils.ml_model": {"train_improved_model": train_improved_model,
+                           "MODEL_VERSION": os.getenv("STUB_MODEL_VERSION", "model-v1")},
+        "utils.strategy": {"STRATEGY_VERSION": "strategy-v1"},
+        "utils.notifier": {"send_telegram": send_telegram},
+    }
+    modules = {}
+    for name, values in attrs.items():
+        module = types.ModuleType(name)
+        module.__dict__.update(values)
+        modules[name] = module
+    return modules
@@ -0,0 +1,55 @@
+import json
+
+from utils.checkpoint import RunJournal, run_fingerprint
+
+
+def test_fingerprint_is_stable_and_input_sensitive():
+    fp = run_fingerprint(["INFY.NS", "TCS.NS"], period="12mo", interval="1d")
+    assert fp == run_fingerprint(["INFY.NS", "TCS.NS"], interval="1d", period="12mo")
+    assert fp != run_fingerprint(["INFY.NS", "TCS.NS"], period="6mo", interval="1d")
+    assert fp != run_fingerprint(["INFY.NS"], period="12mo", interval="1d")
+
+
+def test_journal_round_trip(tmp_path):
+    journal = RunJournal("abc123", run_date="2026-01-02", directory=tmp_path)
+    journal.mark("INFY.NS", "backtest", total_return=0.12, win_ratio=0.55)
+    journal.mark("INFY.NS", "logged")
+
+    with open(journal.path, encoding="utf-8") as f:
+        on_disk = json.load(f)
+    assert on_disk["run_date"] == "2026-01-02"
+    assert on_disk["fingerprint"] == "abc123"
+
+    reloaded = RunJournal("abc123", run_date="2026-01-02", directory=tmp_path)
+    assert reloaded.get("INFY.NS", "backtest") == {"total_return": 0.12, "win_ratio": 0.55}
+    assert reloaded.is_done("INFY.NS", "logged")
+    assert not reloaded.is_done("INFY.NS", "notified")
+    assert not reloaded.is_done("TCS.NS", "backtest")
+
+
+def test_journal_is_scoped_to_date_and_fingerprint(tmp_path):
+    RunJournal("abc123", run_date="2026-01-02", directory=tmp_path).mark("INFY.NS", "logged")
+
+    assert not RunJournal("abc123", run_date="2026-01-03", directory=tmp_path).is_done("INFY.NS", "logged")
+    assert not RunJournal("def456", run_date="2026-01-02", directory=tmp_path).is_done("INFY.NS", "logged")
+
+
+def test_resume_after_clear_and_interrupted_write(tmp_path):
+    journal = RunJournal("abc123", run_date="2026-01-02", directory=tmp_path)
+    journal.mark("INFY.NS", "notifying")
+    journal.clear("INFY.NS", "notifying")
+    journal.mark("TCS.NS", "logging")  # run "dies" here, before the logged mark
+
+    resumed = RunJournal("abc123", run_date="2026-01-02", directory=tmp_path)
+    assert not resumed.is_done("INFY.NS", "notifying")
+    assert resumed.is_done("TCS.NS", "logging")
+    assert not resumed.is_done("TCS.NS", "logged")
+    assert resumed.key("TCS.NS") == "2026-01-02_abc123_TCS.NS"
+
+
+def test_corrupt_journal_starts_fresh(tmp_path):
+    journal = RunJournal("abc123", run_date="2026-01-02", directory=tmp_path)
+    (tmp_path / "2026-01-02_abc123.json").write_text("{not json", encoding="utf-8")
+
+    assert RunJournal("abc123", run_date="2026-01-02", directory=tmp_path).entries == {}
+    assert journal.path.endswith("2026-01-02_abc123.json")
@@ -0,0 +1,85 @@
+import pytest
+
+import stubs
+from stubs import Crash, read_records
+
+STOCKS = ["T0.NS", "T1.NS", "T2.NS"]
+
+
+@pytest.fixture(autouse=True)
+def universe(monkeypatch):
+    monkeypatch.setenv("STUB_STOCKS", ",".join(STOCKS))
+
+
+def sheet_tickers():
+    return [record["row"][0] for record in read_records(stubs.SHEET_FILE)]
+
+
+def alerted_tickers():
+    return [t for message in read_records(stubs.TELEGRAM_FILE) for t in STOCKS if f"Stock: {t}\n" in message]
+
+
+def test_clean_run_writes_every_sink_once(load_main):
+    load_main().run_trading_job()
+
+    assert sheet_tickers() == STOCKS
+    assert alerted_tickers() == STOCKS
+    # Each row carries its run key so an interrupted append can be found again
+    assert all(record["key"].endswith(record["row"][0]) for record in read_records(stubs.SHEET_FILE))
+
+
+def test_crash_between_append_and_logged_mark_does_not_duplicate_row(load_main, monkeypatch):
+    monkeypatch.setenv("STUB_CRASH_AFTER_LOG", "T1.NS")
+    with pytest.raises(Crash):
+        load_main().run_trading_job()
+    assert sheet_tickers() == ["T0.NS", "T1.NS"]
+
+    monkeypatch.delenv("STUB_CRASH_AFTER_LOG")
+    load_main().run_trading_job()
+
+    assert sheet_tickers() == STOCKS
+    assert alerted_tickers() == STOCKS
+    # T0 finished and T1 had its backtest and fit checkpointed: neither is redone
+    assert read_records(stubs.FETCH_FILE) == STOCKS
+    assert read_records(stubs.FIT_FILE) == STOCKS
+
+
+def test_failed_fit_is_retried_while_stock_is_unfinished(load_main, monkeypatch):
+    monkeypatch.setenv("STUB_FAIL_FIT", "T0.NS")
+    monkeypatch.setenv("STUB_SHEET_DOWN", "1")
+    load_main().run_trading_job()
+    assert sheet_tickers() == []
+
+    monkeypatch.delenv("STUB_FAIL_FIT")
+    monkeypatch.delenv("STUB_SHEET_DOWN")
+    load_main().run_trading_job()
+
+    # Only T0's failed fit is redone; T1/T2 reuse their checkpointed models
+    assert read_records(stubs.FIT_FILE) == STOCKS + ["T0.NS"]
+    rows = {record["row"][0]: record["row"] for record in read_records(stubs.SHEET_FILE)}
+    assert rows["T0.NS"][3] == "70.00%"
+
+
+def test_interrupted_alert_is_not_resent(load_main, monkeypatch):
+    monkeypatch.setenv("STUB_CRASH_AFTER_NOTIFY", "T0.NS")
+    with pytest.raises(Crash):
+        load_main().run_trading_job()
+
+    monkeypatch.delenv("STUB_CRASH_AFTER_NOTIFY")
+    load_main().run_trading_job()
+
+    assert alerted_tickers() == STOCKS
+    assert sheet_tickers() == STOCKS
+
+
+def test_failed_alert_is_retried(load_main, monkeypatch):
+    monkeypatch.setenv("STUB_TELEGRAM_DOWN", "1")
+    load_main().run_trading_job()
+    assert alerted_tickers() == []
+
+    monkeypatch.delenv("STUB_TELEGRAM_DOWN")
+    load_main().run_trading_job()
+
+    assert alerted_tickers() == STOCKS
+    assert sheet_tickers() == STOCKS
+    assert read_records(stubs.FETCH_FILE) == STOCKS
@@ -0,0 +1,191 @@
+import argparse
+import csv
+import os
+import subprocess
+import sys
+from datetime import datetime
+
+import pytest
+
+import stubs
+from stubs import read_records
+from utils.checkpoint import RunJournal
+from utils.sharding import parse_shard, shard_of, shard_tickers, collect_shard_results
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+RUNNER = os.path.join(REPO_ROOT, "tests", "run_stubbed_main.py")
+TICKERS = [f"T{i}.NS" for i in range(200)]
+
+
+def test_parse_shard():
+    assert parse_shard("0/1") == (0, 1)
+    assert parse_shard("3/4") == (3, 4)
+
+
+@pytest.mark.parametrize("spec", ["4/4", "-1/4", "0/0", "1", "a/b", "1/2/3", ""])
+def test_parse_shard_rejects_bad_specs(spec):
+    with pytest.raises(argparse.ArgumentTypeError, match="Invalid shard"):
+        parse_shard(spec)
+
+
+def test_parse_shard_error_reaches_argparse_user(capsys):
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--shard", type=parse_shard)
+    with pytest.raises(SystemExit):
+        parser.parse_args(["--shard", "4/4"])
+    assert "Need N >= 1 and 0 <= i < N" in capsys.readouterr().err
+
+
+def test_shard_of_is_stable_across_processes():
+    # A fresh interpreter gets a different str hash salt; the assignment must not change
+    code = "from utils.sharding import shard_of; print([shard_of(t, 7) for t in %r])" % TICKERS
+    out = subprocess.run([sys.executable, "-c", code], cwd=REPO_ROOT, env={**os.environ, "PYTHONHASHSEED": "123"},
+                         capture_output=True, text=True, check=True).stdout
+    assert out.strip() == str([shard_of(t, 7) for t in TICKERS])
+
+
+@pytest.mark.parametrize("count", [1, 3, 7])
+def test_every_ticker_lands_in_exactly_one_shard(count):
+    shards = [shard_tickers(TICKERS, i, count) for i in range(count)]
+    assigned = [t for shard in shards for t in shard]
+    assert sorted(assigned) == sorted(TICKERS)
+    assert len(assigned) == len(set(assigned))
+    if count > 1:
+        assert all(shards)
+
+
+def test_collect_merges_several_shard_journals(tmp_path):
+    count = 3
+    journals = [RunJournal(f"shard{i}of{count}", run_date="2026-01-02", directory=tmp_path) for i in range(count)]
+    for index, journal in enumerate(journals):
+        for ticker in shard_tickers(TICKERS, index, count):
+            if ticker == "T5.NS":
+                journal.mark(ticker, "skipped", reason="no backtest results")
+                continue
+            journal.mark(ticker, "backtest", total_return=0.1, win_ratio=0.5)
+            journal.mark(ticker, "model", accuracy=0.6, auc_score=0.7, model_type="Enhanced Ensemble")
+            if ticker != "T7.NS":  # T7's worker died before logging it
+                journal.mark(ticker, "logged")
+
+    reloaded = [RunJournal(f"shard{i}of{count}", run_date="2026-01-02", directory=tmp_path) for i in range(count)]
+    done, skipped, missing = collect_shard_results(TICKERS, reloaded)
+
+    assert missing == ["T7.NS"]
+    assert skipped == [{"stock": "T5.NS", "reason": "no backtest results"}]
+    assert [row["stock"] for row in done] == [t for t in TICKERS if t not in ("T5.NS", "T7.NS")]
+    assert done[0] == {"stock": "T0.NS", "total_return": 0.1, "win_ratio": 0.5, "accuracy": 0.6,
+                       "auc_score": 0.7, "model_type": "Enhanced Ensemble"}
+
+
+def test_collect_reports_logged_ticker_without_model_as_na(tmp_path):
+    journal = RunJournal("solo", run_date="2026-01-02", directory=tmp_path)
+    journal.mark("T0.NS", "backtest", total_return=0.1, win_ratio=0.5)
+    journal.mark("T0.NS", "logged")
+
+    done, skipped, missing = collect_shard_results(["T0.NS"], [journal])
+    assert done == [{"stock": "T0.NS", "total_return": 0.1, "win_ratio": 0.5,
+                     "accuracy": None, "auc_score": None, "model_type": "N/A"}]
+    assert skipped == [] and missing == []
+
+
+SHARDED = [f"T{i}.NS" for i in range(30)]
+
+
+def run_shards(count, shards=None):
+    workers = [subprocess.Popen([sys.executable, RUNNER, "--shard", f"{i}/{count}"],
+                                stdout=subprocess.PIPE, stderr=subprocess.STDOUT, text=True)
+               for i in (range(count) if shards is None else shards)]
+    for worker in workers:
+        output = worker.communicate()[0]
+        assert worker.returncode == 0, output
+
+
+def digests():
+    return [m for m in read_records(stubs.TELEGRAM_FILE) if "Digest" in m]
+
+
+def read_report(path):
+    with open(path, newline="", encoding="utf-8") as f:
+        return list(csv.DictReader(f))
+
+
+@pytest.fixture
+def sharded_env(load_main, monkeypatch):
+    # Subprocess workers inherit the environment and the working directory load_main set up
+    monkeypatch.setenv("STUB_STOCKS", ",".join(SHARDED))
+    monkeypatch.setenv("STUB_EMPTY", "T4.NS")
+    monkeypatch.setenv("STUB_NO_TRADES", "T5.NS")
+    return load_main
+
+
+def test_shard_workers_and_merge_send_one_digest(sharded_env, monkeypatch):
+    run_shards(3)
+    main = sharded_env()
+
+    # Workers log to Sheets but leave alerts to the digest
+    assert sorted(r["row"][0] for r in read_records(stubs.SHEET_FILE)) == \
+        sorted(t for t in SHARDED if t not in ("T4.NS", "T5.NS"))
+    assert read_records(stubs.TELEGRAM_FILE) == []
+
+    # T4's empty download might be an outage: it stays pending and holds the digest back
+    main.merge_shard_results(3)
+    assert digests() == []
+    report = os.path.join("reports", f"{datetime.now().strftime('%Y-%m-%d')}_shards-3.csv")
+    rows = read_report(report)
+    assert len(rows) == 29
+    assert {"stock": "T5.NS", "reason": "no backtest results"}.items() <= rows[-1].items()
+
+    # Re-running only T4's shard fetches only T4 again
+    monkeypatch.delenv("STUB_EMPTY")
+    fetched_before = len(read_records(stubs.FETCH_FILE))
+    run_shards(3, shards=[shard_of("T4.NS", 3)])
+    assert read_records(stubs.FETCH_FILE)[fetched_before:] == ["T4.NS"]
+
+    main.merge_shard_results(3)
+    main.merge_shard_results(3)
+    assert len(digests()) == 1
+    assert "29 analysed, 1 skipped, 30 total" in digests()[0]
+    assert report in digests()[0]
+    assert [row["stock"] for row in read_report(report)] == [t for t in SHARDED if t != "T5.NS"] + ["T5.NS"]
+
+
+def test_merge_via_cli_uses_shard_fingerprints(sharded_env, monkeypatch):
+    monkeypatch.delenv("STUB_EMPTY")
+    run_shards(2)
+    today = datetime.now().strftime("%Y-%m-%d")
+    for _ in range(2):
+        subprocess.run([sys.executable, RUNNER, "--merge", "2", "--date", today], check=True, capture_output=True)
+    assert len(digests()) == 1
+
+    # Another day's shards are not found, so nothing is sent for them
+    result = subprocess.run([sys.executable, RUNNER, "--merge", "2", "--date", "2000-01-01"],
+                            check=True, capture_output=True, text=True)
+    assert "30 stocks not finished" in result.stdout
+    assert len(digests()) == 1
+
+
+def test_new_model_version_gets_its_own_digest(sharded_env, monkeypatch):
+    monkeypatch.delenv("STUB_EMPTY")
+    run_shards(2)
+    sharded_env().merge_shard_results(2)
+    assert len(digests()) == 1
+
+    monkeypatch.setenv("STUB_MODEL_VERSION", "model-v2")
+    run_shards(2)
+    sharded_env().merge_shard_results(2)
+    assert len(digests()) == 2
+
+
+@pytest.mark.parametrize("args, error", [
+    (["--merge", "0"], "--merge needs N >= 1"),
+    (["--merge", "-2"], "--merge needs N >= 1"),
+    (["--shard", "4/4"], "Invalid shard '4/4'"),
+    (["--shard", "0/2", "--merge", "2"], "not allowed with argument"),
+    (["--merge", "2", "--date", "2026-13-01"], "Invalid date"),
+    (["--date", "2026-01-01"], "--date only applies to --merge"),
+])
+def test_cli_rejects_bad_options(sharded_env, args, error):
+    result = subprocess.run([sys.executable, RUNNER, *args], capture_output=True, text=True)
+    assert result.returncode == 2
+    assert error in result.stderr
+    assert read_records(stubs.FETCH_FILE) == [] and read_records(stubs.TELEGRAM_FILE) == []
@@ -0,0 +1,64 @@
+import hashlib
+import json
+import os
+from datetime import datetime
+
+CHECKPOINT_DIR = os.getenv("CHECKPOINT_DIR", ".checkpoints")
+
+def run_fingerprint(tickers, **params):
+    # Same tickers + same fetch/strategy params on the same day -> same journal
+    payload = json.dumps({"tickers": list(tickers), "params": params}, sort_keys=True)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()[:12]
+
+class RunJournal:
+    """Local journal of completed per-ticker stages for one run.
+
+    Keyed by run date and input fingerprint, so a restart on the same day
+    with the same inputs picks up where the last run stopped.
+    """
+
+    def __init__(self, fingerprint, run_date=None, directory=CHECKPOINT_DIR):
+        self.run_date = run_date or datetime.now().strftime("%Y-%m-%d")
+        self.fingerprint = fingerprint
+        self.path = os.path.join(directory, f"{self.run_date}_{fingerprint}.json")
+        self.entries = self._load()
+
+    def _load(self):
+        if not os.path.exists(self.path):
+            return {}
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                return json.load(f).get("tickers", {})
+        except (OSError, ValueError) as e:
+            print(f"⚠️ Could not read checkpoint {self.path}: {e}. Starting fresh.")
+            return {}
+
+    def _save(self):
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump({
+                "run_date": self.run_date,
+                "fingerprint": self.fingerprint,
+                "tickers": self.entries
+            }, f, indent=2)
+        # Atomic swap so a crash mid-write never leaves a corrupt journal
+        os.replace(tmp_path, self.path)
+
+    def is_done(self, ticker, stage):
+        return stage in self.entries.get(ticker, {})
+
+    def get(self, ticker, stage):
+        return self.entries.get(ticker, {}).get(stage)
+
+    def mark(self, ticker, stage, **result):
+        self.entries.setdefault(ticker, {})[stage] = result
+        self._save()
+
+    def clear(self, ticker, stage):
+        if self.entries.get(ticker, {}).pop(stage, None) is not None:
+            self._save()
+
+    def key(self, ticker):
+        # Unique per ticker per run; written alongside sink rows so they can be deduplicated
+        return f"{self.run_date}_{self.fingerprint}_{ticker}"
@@ -1,6 +1,9 @@
 import yfinance as yf
 
-def fetch_data(ticker, period="12mo", interval="1d"):
+FETCH_PERIOD = "12mo"
+FETCH_INTERVAL = "1d"
+
+def fetch_data(ticker, period=FETCH_PERIOD, interval=FETCH_INTERVAL):
     data = yf.download(ticker, period=period, interval=interval)
     data.dropna(inplace=True)
     return data
\ No newline at end of file
@@ -9,8 +9,12 @@ def connect_to_sheets():
     client = gspread.authorize(creds)
     return client.open(SHEET_NAME)
 
-def log_trade(sheet, trade_data):
-    sheet.worksheet("Trade Data").append_row(trade_data)
+def log_trade(sheet, trade_data, run_key=None):
+    row = trade_data + [run_key] if run_key else trade_data
+    sheet.worksheet("Trade Data").append_row(row)
+
+def trade_logged(sheet, run_key):
+    return bool(sheet.worksheet("Trade Data").findall(run_key))
 
 def apply_conditional_formatting():
     # Reuse the same credentials for the Sheets API
@@ -10,6 +10,9 @@ from xgboost import XGBClassifier
 import numpy as np
 import pandas as pd
 
+# Bump whenever features, models or hyperparameters change; part of the run fingerprint
+MODEL_VERSION = "stacking-rf-xgb-lr-v1"
+
 # Central logging function
 def log(msg, level="info", verbose=True):
     if verbose:
@@ -11,7 +11,7 @@ def send_telegram(message, retries=3, delay=3):
             response = requests.post(url, data=data, timeout=10)
             response.raise_for_status()
             print(f"📤 Telegram message sent successfully.")
-            return
+            return True
         except requests.exceptions.RequestException as e:
             print(f"⚠️ Telegram attempt {attempt} failed: {e}")
             if attempt < retries:
@@ -19,3 +19,4 @@ def send_telegram(message, retries=3, delay=3):
                 time.sleep(delay)
             else:
                 print("❌ All retries failed. Telegram message not sent.")
+    return False
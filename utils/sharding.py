@@ -0,0 +1,47 @@
+import argparse
+import hashlib
+
+def parse_shard(spec):
+    # "i/N" -> (i, N), with 0 <= i < N. Used as an argparse type, so errors
+    # are ArgumentTypeError to get their message shown on the command line
+    try:
+        index, count = (int(part) for part in spec.split("/"))
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"Invalid shard '{spec}'. Expected the form i/N, e.g. 0/4.")
+    if count < 1 or not 0 <= index < count:
+        raise argparse.ArgumentTypeError(f"Invalid shard '{spec}'. Need N >= 1 and 0 <= i < N.")
+    return index, count
+
+def shard_of(ticker, count):
+    # md5 rather than hash(): Python salts str hashes per process, and every
+    # worker must agree on where each ticker lives
+    digest = hashlib.md5(ticker.encode("utf-8")).hexdigest()
+    return int(digest, 16) % count
+
+def shard_tickers(tickers, index, count):
+    return [t for t in tickers if shard_of(t, count) == index]
+
+def collect_shard_results(tickers, journals):
+    """Merge per-ticker results from every shard's journal.
+
+    Returns (done, skipped, missing), each in universe order: result rows
+    for tickers whose worker finished them, {"stock", "reason"} rows for
+    tickers a worker deliberately skipped, and the tickers no worker has
+    finished yet.
+    """
+    done, skipped, missing = [], [], []
+    for ticker in tickers:
+        journal = next((j for j in journals if j.is_done(ticker, "logged")), None)
+        if journal is not None:
+            done.append({
+                "stock": ticker,
+                **journal.get(ticker, "backtest"),
+                **(journal.get(ticker, "model") or {"accuracy": None, "auc_score": None, "model_type": "N/A"})
+            })
+            continue
+        journal = next((j for j in journals if j.is_done(ticker, "skipped")), None)
+        if journal is not None:
+            skipped.append({"stock": ticker, **journal.get(ticker, "skipped")})
+            continue
+        missing.append(ticker)
+    return done, skipped, missing
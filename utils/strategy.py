@@ -1,5 +1,8 @@
 from utils.indicators import calculate_rsi, add_moving_averages
 
+# Bump whenever the signal rules or indicator windows change; part of the run fingerprint
+STRATEGY_VERSION = "rsi40-dma20x50-v1"
+
 def generate_signals(data):
     data = calculate_rsi(add_moving_averages(data))
     data['Signal'] = 0